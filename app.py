@@ -6,17 +6,37 @@
 
 __version__ = "1.5.0"
 
+import argparse
+import atexit
 import os
 import sys
 import subprocess
-import re
 import json
 import logging
 import platform
+import bisect
+import functools
+import glob
+import queue
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Tuple
-from logging.handlers import RotatingFileHandler
+from typing import Optional, Dict, List, Tuple
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+try:
+    # 任意の依存: インストールされていればffprobeを起動せずに動画情報を読む
+    import av
+except ImportError:
+    av = None
 
 
 class QualityMode:
@@ -44,14 +64,275 @@ class QualityMode:
     }
 
 
+@dataclass
+class VideoMeta:
+    """ffprobeの結果から必要な値だけを取り出した動画メタデータ"""
+    duration: float
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    
+    @classmethod
+    def from_probe(cls, video_info: dict) -> 'VideoMeta':
+        """ffprobeのJSONからメタデータを生成"""
+        duration = float(video_info['format']['duration'])
+        for stream in video_info.get('streams', []):
+            if stream.get('codec_type') == 'video':
+                # 平均を出せない場合 avg_frame_rate は '0/0' になるので r_frame_rate も試す
+                fps = 0.0
+                for key in ('avg_frame_rate', 'r_frame_rate'):
+                    num, _, den = (stream.get(key) or '').partition('/')
+                    try:
+                        fps = float(num) / float(den or 1)
+                    except (ValueError, ZeroDivisionError):
+                        continue
+                    if fps > 0:
+                        break
+                return cls(duration, stream.get('width', 0), stream.get('height', 0), fps)
+        return cls(duration)
+    
+    @property
+    def duration_ms(self) -> int:
+        return int(self.duration * 1000)
+    
+    @property
+    def has_video(self) -> bool:
+        return self.width > 0 and self.height > 0
+
+
+@dataclass
+class FileJob:
+    """処理対象の1ファイル（サイズとメタデータは一度だけ取得して使い回す）"""
+    path: Path
+    size_mb: float
+    meta: Optional[VideoMeta] = None  # ffprobe未取得・失敗時はNone
+
+
+@dataclass
+class CompressSettings:
+    """1ファイル分の圧縮設定"""
+    target_size_mb: float
+    quality_mode: str
+    output_format: Optional[str] = None  # None の場合は元の拡張子を維持
+
+
+# 予想画質の判定表: (最小の高さ, 最高画質, 高画質, 標準画質) のビットレート閾値[kbps]
+_QTABLE = [
+    (0,     1000,   500,   250),
+    (480,   2500,  1000,   500),
+    (720,   5000,  2500,  1500),
+    (1080,  8000,  5000,  3000),
+    (1440, 16000, 10000,  6000),
+    (2160, 35000, 20000, 13000),
+]
+_QTABLE_HEIGHTS = [row[0] for row in _QTABLE]
+
+# 実行中に変わらない環境情報（platform.system()やPath.home()を何度も呼ばない）
+_PLATFORM = platform.system()
+_CONFIG_DIR = Path.home() / '.video-compressor'
+_HISTORY_LOG_PATH = _CONFIG_DIR / 'history.log'
+
+# Windowsではffmpegを別プロセスグループで起動し、中断時はCTRL_BREAKで終了させる
+# （TerminateProcessは即時終了で、出力ファイルが書き終わらないため）
+_FFMPEG_CREATIONFLAGS = subprocess.CREATE_NEW_PROCESS_GROUP if _PLATFORM == 'Windows' else 0
+
+# プラットフォームに応じたnullデバイス
+_NULL_DEVICE = 'NUL' if _PLATFORM == 'Windows' else '/dev/null'
+
+
+@functools.lru_cache(maxsize=1)
+def _check_ffmpeg() -> bool:
+    """ffmpegがインストールされているか確認（実行中に変わらないので結果をキャッシュ）"""
+    try:
+        subprocess.run(
+            ['ffmpeg', '-version'], 
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.PIPE,
+            check=True
+        )
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+@dataclass(frozen=True)
+class FfmpegCaps:
+    """インストールされているffmpegで使えるエンコーダとハードウェアアクセラレーション"""
+    encoders: frozenset
+    hwaccels: frozenset
+
+
+def _ffmpeg_list(option: str) -> List[str]:
+    """ffmpeg -encoders / -hwaccels の出力行を取得（失敗時は空）"""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', option],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return []
+    return result.stdout.splitlines()
+
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_capabilities() -> FfmpegCaps:
+    """ffmpegのエンコーダ一覧とhwaccel一覧を取得（実行中に変わらないので結果をキャッシュ）"""
+    # -encoders は " V....D libx264   説明" の形式で、"------" の行より後が一覧
+    encoders = set()
+    listing = False
+    for line in _ffmpeg_list('-encoders'):
+        fields = line.split()
+        if listing and len(fields) >= 2:
+            encoders.add(fields[1])
+        elif fields and fields[0].startswith('---'):
+            listing = True
+    
+    # -hwaccels は見出し行の後に1行1つ
+    hwaccels = {line.strip() for line in _ffmpeg_list('-hwaccels')[1:] if line.strip()}
+    return FfmpegCaps(frozenset(encoders), frozenset(hwaccels))
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_install_instructions(system: str) -> str:
+    """プラットフォームに応じたffmpegインストール方法を取得"""
+    if system == 'Darwin':  # macOS
+        return """以下のコマンドでインストールしてください:
+  brew install ffmpeg"""
+    elif system == 'Windows':
+        return """以下のいずれかの方法でインストールしてください:
+
+方法1: Chocolatey (推奨)
+  choco install ffmpeg
+
+方法2: Scoop
+  scoop install ffmpeg
+
+方法3: 手動インストール
+  1. https://www.gyan.dev/ffmpeg/builds/ から ffmpeg-release-essentials.zip をダウンロード
+  2. 解凍してC:\\ffmpegに配置
+  3. システム環境変数PATHにC:\\ffmpeg\\binを追加"""
+    else:  # Linux
+        return """以下のコマンドでインストールしてください:
+
+Ubuntu/Debian:
+  sudo apt update && sudo apt install ffmpeg
+
+Fedora:
+  sudo dnf install ffmpeg
+
+Arch:
+  sudo pacman -S ffmpeg"""
+
+
+@functools.lru_cache(maxsize=1)
+def _enable_ansi_escapes() -> bool:
+    """標準出力でANSIエスケープ(カーソル移動)を使えるようにする。使えなければFalse
+
+    Windowsのコンソール(conhost)は仮想端末処理を有効にしないとエスケープをそのまま表示する。
+    """
+    if _PLATFORM != 'Windows':
+        return True
+    try:
+        import ctypes
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = wintypes.DWORD()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (OSError, AttributeError):
+        return False
+
+
+def _fit_width(text: str, width: int) -> str:
+    """全角文字を2桁として、表示幅がwidthに収まるよう末尾を切り詰める
+
+    █ や ░ などの幅が曖昧な文字(A)は、日本語環境の端末で2桁表示されるため2桁として数える。
+    """
+    used = 0
+    for i, ch in enumerate(text):
+        used += 2 if unicodedata.east_asian_width(ch) in ('W', 'F', 'A') else 1
+        if used > width:
+            return text[:i]
+    return text
+
+
+class _ProgressBoard:
+    """並列エンコード中の各ffmpegの進捗を1ジョブ1行でまとめて描画する
+
+    ANSIのカーソル移動で前回描画した行を消して書き直すため、エスケープを解釈する端末(TTY)出力でのみ使う。
+    """
+
+    def __init__(self, repaint_interval: float):
+        self._rows: Dict[int, List[str]] = {}  # キー -> [ラベル, 状態]（挿入順に表示）
+        self._drawn = 0
+        self._last_paint = 0.0
+        self._repaint_interval = repaint_interval
+        self._lock = threading.Lock()
+
+    def start(self, key: int, label: str):
+        """行を追加"""
+        with self._lock:
+            self._rows[key] = [label, "開始待ち..."]
+            self._repaint()
+
+    def update(self, key: int, status: str, force: bool = False):
+        """行の状態を更新（再描画は全体で一定間隔に間引く）"""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return
+            row[1] = status
+            if force or time.monotonic() - self._last_paint >= self._repaint_interval:
+                self._repaint()
+
+    def finish(self, key: int):
+        """行を取り除く"""
+        with self._lock:
+            if self._rows.pop(key, None) is not None:
+                self._repaint()
+
+    def write_above(self, text: str):
+        """進捗行の上にメッセージを出力"""
+        with self._lock:
+            self._clear()
+            sys.stdout.write(text + '\n')
+            self._draw()
+
+    def _repaint(self):
+        self._clear()
+        self._draw()
+        self._last_paint = time.monotonic()
+
+    def _clear(self):
+        if self._drawn:
+            # 描画済みの行頭まで戻り、そこから下を消去
+            sys.stdout.write(f'\x1b[{self._drawn}F\x1b[J')
+            self._drawn = 0
+
+    def _draw(self):
+        # 折り返すとカーソル移動の行数がずれるので端末幅で切り詰める
+        width = shutil.get_terminal_size().columns - 1
+        for label, status in self._rows.values():
+            sys.stdout.write(_fit_width(f'{label} {status}', width) + '\n')
+        self._drawn = len(self._rows)
+        sys.stdout.flush()
+
+
 class VideoCompressor:
     """動画圧縮を管理するクラス"""
     
-    # サポートする動画形式
-    SUPPORTED_FORMATS = [
+    # サポートする動画形式（表示順）
+    SUPPORTED_FORMAT_LIST = (
         '.mp4', '.avi', '.mov', '.mkv', '.flv', 
         '.wmv', '.webm', '.m4v', '.mpeg', '.mpg'
-    ]
+    )
+    # 拡張子判定用
+    SUPPORTED_FORMATS = frozenset(SUPPORTED_FORMAT_LIST)
     
     # 変換可能な拡張子
     CONVERT_FORMATS = {
@@ -63,24 +344,134 @@ class VideoCompressor:
         '6': ('flv', 'FLV (Flash Video)'),
     }
     
-    def __init__(self, dry_run: bool = False):
+    # libx264のプリセット（速い順）
+    X264_PRESETS = (
+        'ultrafast', 'superfast', 'veryfast', 'faster', 'fast',
+        'medium', 'slow', 'slower', 'veryslow'
+    )
+    DEFAULT_X264_PRESET = 'medium'
+    
+    # 1パスあたり100万画素のエンコードにかかる秒数の初期値（実測でEWMA更新する）
+    DEFAULT_PRESET_COSTS = {
+        'ultrafast': 0.0008,
+        'superfast': 0.0012,
+        'veryfast': 0.0018,
+        'faster': 0.003,
+        'fast': 0.004,
+        'medium': 0.005,
+        'slow': 0.008,
+        'slower': 0.016,
+        'veryslow': 0.03,
+    }
+    PRESET_COST_EWMA_ALPHA = 0.3
+    
+    # 進捗バーの再描画間隔(秒)
+    PROGRESS_REPAINT_INTERVAL = 0.1
+    
+    # ソフトウェアエンコーダ
+    CPU_ENCODER = 'libx264'
+    
+    # ハードウェアエンコーダ（優先順）と、入力前・フィルタに必要な追加引数、
+    # ffmpegのビルドに必要なhwaccel（不要ならNone）
+    HW_ENCODERS = {
+        'h264_videotoolbox': {'input_args': [], 'filter_args': [], 'hwaccel': None},  # macOSのみ
+        'h264_nvenc': {'input_args': [], 'filter_args': [], 'hwaccel': None},
+        'h264_qsv': {'input_args': [], 'filter_args': [], 'hwaccel': 'qsv'},
+        'h264_vaapi': {
+            'input_args': ['-vaapi_device', '/dev/dri/renderD128'],
+            'filter_args': ['-vf', 'format=nv12,hwupload'],
+            'hwaccel': 'vaapi',
+        },
+    }
+    
+    # -movflags +faststart を付ける出力形式
+    FASTSTART_FORMATS = ('.mp4', '.mov', '.m4v')
+    
+    # ffprobeの同時実行数
+    PROBE_MAX_WORKERS = 8
+    
+    # --jobs 未指定時にハードウェアエンコーダで同時に走らせる数
+    HW_ENCODER_MAX_JOBS = 3
+    
+    # --fast-seek 指定時のキーフレーム間隔(フレーム数)
+    FAST_SEEK_GOP = 60
+    
+    # --jobs 未指定時、x264の1ジョブに割り当てるCPUスレッド数（コア数÷この値を同時実行数にする）
+    X264_THREADS_PER_JOB = 4
+    
+    # 機械可読な進捗(key=value)をstdoutに出させ、stderrはエラーのみにする
+    FFMPEG_PROGRESS_ARGS = ['-progress', 'pipe:1', '-nostats', '-loglevel', 'error']
+    
+    # ffmpegの出力を読むパイプのバッファサイズ（読み取りのシステムコール回数を減らす）
+    FFMPEG_PIPE_BUFSIZE = 1 << 20
+    
+    # 中断時にffmpegの終了（出力ファイルの書き終え）を待つ秒数。過ぎたら強制終了する
+    FFMPEG_TERMINATE_TIMEOUT = 5
+    
+    # エラー報告用に保持するffmpegのstderrの行数（古い行から捨てる）
+    FFMPEG_STDERR_TAIL_LINES = 200
+    
+    # 画質モードの選択肢と、フェーズ2.5で表示するメニュー
+    QUALITY_MODE_CHOICES = {
+        '1': QualityMode.AUDIO_PRIORITY,
+        '2': QualityMode.VIDEO_PRIORITY,
+        '3': QualityMode.BALANCED,
+    }
+    QUALITY_MODE_MENU = (
+        "\n【フェーズ2.5】画質モード選択\n"
+        "どのモードで圧縮しますか？\n"
+        "\n"
+        "  1. 音質優先 (音声192kbps)\n"
+        "     音楽、講演、ASMR などの音が重要なコンテンツ向け\n"
+        "\n"
+        "  2. 画質優先 (音声128kbps)\n"
+        "     アニメ、映画、ゲーム実況 などの映像が重要なコンテンツ向け\n"
+        "\n"
+        "  3. バランス (音声160kbps)\n"
+        "     一般的な動画向け。音質と画質のバランスが取れた設定\n"
+    )
+    QUALITY_MODE_PROMPT = "番号を選択してください (デフォルト: 1): "
+    
+    def __init__(self, dry_run: bool = False, jobs: Optional[int] = None,
+                 crf: Optional[int] = None, time_budget: Optional[float] = None,
+                 force_cpu: bool = False, assume_yes: bool = False,
+                 fast_seek: bool = False):
         self.input_files: List[Path] = []
         self.target_size_mb: Optional[float] = None
         self.output_format: Optional[str] = None
         self.quality_mode: Optional[str] = None
         self.batch_mode: bool = False
         self.dry_run: bool = dry_run
+        self.jobs: Optional[int] = jobs
+        self.crf: Optional[int] = crf
+        self.time_budget: Optional[float] = time_budget
+        self.force_cpu: bool = force_cpu
+        self.assume_yes: bool = assume_yes
+        self.fast_seek: bool = fast_seek
+        self._ffmpeg_caps: Optional[FfmpegCaps] = None  # reset()では消さない
+        self._hw_encoder: Optional[str] = None
+        self._hw_encoder_lock = threading.Lock()
+        self._print_lock = threading.Lock()
+        self._active_workers: int = 1
+        self._active_procs = set()  # 実行中のffmpeg（中断時に終了させる）
+        self._active_procs_lock = threading.RLock()  # シグナルハンドラから再入しうる
+        self._cancelled = False  # 中断後は新しいジョブ・ffmpegを始めない
+        self._pending_futures: List[Future] = []  # 並列実行中のジョブ
+        self._board: Optional[_ProgressBoard] = None  # 並列実行中かつTTY出力のときのみ
+        self._preset_costs: Optional[dict] = None
+        self._preset_costs_lock = threading.Lock()
+        self._log_listener: Optional[QueueListener] = None
+        self._supported_formats_str = f"サポート形式: {', '.join(self.SUPPORTED_FORMAT_LIST)}"
         self.logger = self._setup_logger()
         self.start_time: Optional[float] = None
-        self.platform = platform.system()
+        self.platform = _PLATFORM
     
     def _setup_logger(self) -> logging.Logger:
         """ロガーのセットアップ"""
         # ログディレクトリ作成（Windows/macOS/Linux対応）
-        log_dir = Path.home() / '.video-compressor'
-        log_dir.mkdir(exist_ok=True)
+        self.get_config_dir().mkdir(exist_ok=True)
         
-        log_file = log_dir / 'history.log'
+        log_file = _HISTORY_LOG_PATH
         
         logger = logging.getLogger('VideoCompressor')
         logger.setLevel(logging.INFO)
@@ -100,63 +491,75 @@ class VideoCompressor:
         )
         file_handler.setFormatter(formatter)
         
-        logger.addHandler(file_handler)
+        # ファイル書き込みはバックグラウンドスレッドに任せ、呼び出し側をブロックしない
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        self._log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        self._log_listener.start()
+        # main()のfinallyを通らない終了経路でもキューに残ったログを書き出す
+        atexit.register(self.close)
         
         return logger
     
+    def close(self):
+        """未書き込みのログを書き出してロガーを停止"""
+        if self._log_listener is None:
+            return
+        self._log_listener.stop()
+        for handler in self._log_listener.handlers:
+            handler.close()
+        self._log_listener = None
+    
+    def get_config_dir(self) -> Path:
+        """設定・履歴ファイルの保存先ディレクトリ"""
+        return _CONFIG_DIR
+    
     def check_ffmpeg(self) -> bool:
-        """ffmpegがインストールされているか確認"""
-        try:
-            subprocess.run(
-                ['ffmpeg', '-version'], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        """ffmpegがインストールされているか確認し、使える機能を記録"""
+        if not _check_ffmpeg():
             return False
+        self._get_ffmpeg_caps()
+        return True
+    
+    def _get_ffmpeg_caps(self) -> FfmpegCaps:
+        """ffmpegのエンコーダ・hwaccel一覧（初回のみffmpegに問い合わせる）"""
+        if self._ffmpeg_caps is None:
+            self._ffmpeg_caps = _ffmpeg_capabilities()
+            self.logger.info(
+                f"ffmpeg hwaccel: {', '.join(sorted(self._ffmpeg_caps.hwaccels)) or 'なし'}"
+            )
+        return self._ffmpeg_caps
     
     def get_ffmpeg_install_instructions(self) -> str:
         """プラットフォームに応じたffmpegインストール方法を取得"""
-        if self.platform == 'Darwin':  # macOS
-            return """以下のコマンドでインストールしてください:
-  brew install ffmpeg"""
-        elif self.platform == 'Windows':
-            return """以下のいずれかの方法でインストールしてください:
-
-方法1: Chocolatey (推奨)
-  choco install ffmpeg
-
-方法2: Scoop
-  scoop install ffmpeg
-
-方法3: 手動インストール
-  1. https://www.gyan.dev/ffmpeg/builds/ から ffmpeg-release-essentials.zip をダウンロード
-  2. 解凍してC:\\ffmpegに配置
-  3. システム環境変数PATHにC:\\ffmpeg\\binを追加"""
-        else:  # Linux
-            return """以下のコマンドでインストールしてください:
-
-Ubuntu/Debian:
-  sudo apt update && sudo apt install ffmpeg
-
-Fedora:
-  sudo dnf install ffmpeg
-
-Arch:
-  sudo pacman -S ffmpeg"""
+        return _ffmpeg_install_instructions(self.platform)
     
     def get_video_files_from_directory(self, directory: Path) -> List[Path]:
         """ディレクトリ内の全動画ファイルを取得"""
-        video_files = []
-        for file_path in directory.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in self.SUPPORTED_FORMATS:
-                video_files.append(file_path)
-        return sorted(video_files)
+        # scandirはエントリ種別を一緒に返すので、ファイルごとのstatが不要
+        with os.scandir(directory) as entries:
+            return sorted(
+                Path(entry.path) for entry in entries
+                if entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in self.SUPPORTED_FORMATS
+            )
+    
+    def get_video_files_from_pattern(self, pattern: str) -> List[Path]:
+        """ワイルドカード(例: ~/videos/*.mp4, **/*.mov)に一致する動画ファイルを取得"""
+        matches = glob.glob(os.path.expanduser(pattern), recursive=True)
+        return sorted({
+            Path(match) for match in matches
+            if os.path.splitext(match)[1].lower() in self.SUPPORTED_FORMATS
+            and os.path.isfile(match)
+        })
     
     def get_video_info(self, video_path: Path) -> dict:
-        """ffprobeで動画情報を取得"""
+        """動画情報を取得（PyAVがあればプロセス内で、なければffprobeで）"""
+        if av is not None:
+            video_info = self._get_video_info_pyav(video_path)
+            if video_info is not None:
+                return video_info
+        
         try:
             cmd = [
                 'ffprobe',
@@ -175,6 +578,90 @@ Arch:
             self.logger.error(f"JSON解析失敗: {video_path.name}")
             raise RuntimeError("動画情報のパースに失敗。ファイルが壊れてるかも")
     
+    def _get_video_info_pyav(self, video_path: Path) -> Optional[dict]:
+        """PyAVでコンテナ情報を読み、ffprobeと同じ形のdictを返す（失敗時はNone）"""
+        try:
+            with av.open(str(video_path)) as container:
+                if container.duration is None:
+                    return None
+                streams = []
+                video = next((s for s in container.streams if s.type == 'video'), None)
+                if video is not None:
+                    rate = video.average_rate
+                    streams.append({
+                        'codec_type': 'video',
+                        'width': video.width,
+                        'height': video.height,
+                        'avg_frame_rate': f'{rate.numerator}/{rate.denominator}' if rate else '0/0',
+                    })
+                return {
+                    'format': {'duration': container.duration / av.time_base},
+                    'streams': streams,
+                }
+        except Exception as e:
+            # 読めない場合はffprobeに任せる
+            self.logger.warning(f"PyAVでの動画情報取得失敗: {video_path.name}, エラー: {e}")
+            return None
+    
+    def get_video_meta(self, video_path: Path) -> VideoMeta:
+        """ffprobeで動画情報を取得し、VideoMetaに変換"""
+        video_info = self.get_video_info(video_path)
+        try:
+            return VideoMeta.from_probe(video_info)
+        except (KeyError, TypeError, ValueError):
+            self.logger.error(f"動画の長さ取得失敗: {video_path.name}")
+            raise RuntimeError("動画の長さを取得できなかった。ファイルが壊れてるかも")
+    
+    def get_video_infos(self, paths: List[Path]) -> Dict[Path, dict]:
+        """複数ファイルのffprobeを並列実行（失敗したファイルは含めない）"""
+        if not paths:
+            return {}
+        
+        infos = {}
+        # ffprobeは別プロセスなので、待ち受けはスレッドで十分
+        with ThreadPoolExecutor(max_workers=min(self.PROBE_MAX_WORKERS, len(paths))) as executor:
+            futures = {executor.submit(self.get_video_info, path): path for path in paths}
+            for future in as_completed(futures):
+                try:
+                    infos[futures[future]] = future.result()
+                except Exception:
+                    # ffprobeが見つからない場合なども含め、失敗したファイルは処理時に改めてエラーとして扱う
+                    pass
+        return infos
+    
+    def _prefetch_metadata(self, paths: List[Path]) -> Dict[Path, VideoMeta]:
+        """複数ファイルの動画情報を並列取得してVideoMetaに変換"""
+        metadata = {}
+        for path, video_info in self.get_video_infos(paths).items():
+            try:
+                metadata[path] = VideoMeta.from_probe(video_info)
+            except (KeyError, TypeError, ValueError):
+                pass
+        return metadata
+    
+    def _start_metadata_prefetch(self, paths: List[Path]) -> 'Future[Dict[Path, VideoMeta]]':
+        """ユーザーが設定を入力している間に、裏で動画情報の取得を進める"""
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self._prefetch_metadata, paths)
+        executor.shutdown(wait=False)
+        return future
+    
+    def _load_file_jobs(self, paths: List[Path]) -> List[FileJob]:
+        """各ファイルのサイズを一度だけ取得してFileJobにまとめる（メタデータは後から付与）"""
+        return [FileJob(path, self.get_file_size_mb(path)) for path in paths]
+    
+    def _attach_metadata(self, file_jobs: List[FileJob], metadata: Dict[Path, VideoMeta]):
+        """先読みしたメタデータをFileJobに設定"""
+        for job in file_jobs:
+            if job.meta is None:
+                job.meta = metadata.get(job.path)
+    
+    def _ensure_meta(self, job: FileJob) -> VideoMeta:
+        """先読みに失敗したファイルはここで改めて取得する（失敗時は例外）"""
+        if job.meta is None:
+            job.meta = self.get_video_meta(job.path)
+        return job.meta
+    
     def get_file_size_mb(self, file_path: Path) -> float:
         """ファイルサイズをMB単位で取得"""
         size_bytes = file_path.stat().st_size
@@ -197,44 +684,14 @@ Arch:
         video_bitrate_bps = video_total_bits / duration
         return int(video_bitrate_bps / 1000 * 0.95)
     
-    def estimate_quality_level(self, video_bitrate: int, video_info: dict) -> str:
+    def estimate_quality_level(self, video_bitrate: int, meta: VideoMeta) -> str:
         """ビットレートから予想画質レベルを判定"""
-        video_stream = None
-        for stream in video_info.get('streams', []):
-            if stream.get('codec_type') == 'video':
-                video_stream = stream
-                break
-        
-        if not video_stream:
+        if not meta.has_video:
             return "不明"
         
-        width = video_stream.get('width', 0)
-        height = video_stream.get('height', 0)
-        
-        if height >= 2160:
-            excellent = 35000
-            good = 20000
-            acceptable = 13000
-        elif height >= 1440:
-            excellent = 16000
-            good = 10000
-            acceptable = 6000
-        elif height >= 1080:
-            excellent = 8000
-            good = 5000
-            acceptable = 3000
-        elif height >= 720:
-            excellent = 5000
-            good = 2500
-            acceptable = 1500
-        elif height >= 480:
-            excellent = 2500
-            good = 1000
-            acceptable = 500
-        else:
-            excellent = 1000
-            good = 500
-            acceptable = 250
+        # 解像度帯ごとの閾値を二分探索で引く
+        idx = bisect.bisect_right(_QTABLE_HEIGHTS, meta.height) - 1
+        excellent, good, acceptable = _QTABLE[max(idx, 0)][1:]
         
         if video_bitrate >= excellent:
             return "最高画質 (ほぼ劣化なし)"
@@ -245,128 +702,526 @@ Arch:
         else:
             return "低画質 (明らかに劣化)"
     
-    def compress_video(self, input_path: Path, output_path: Path, video_bitrate: int, 
-                      video_info: dict, audio_bitrate: int, current: int = 1, total: int = 1):
-        """動画を圧縮(2パスエンコーディング)"""
+    def _pick_video_encoder(self) -> str:
+        """今回の圧縮で使うH.264エンコーダ（使えるハードウェアエンコーダ、なければlibx264。初回のみ判定）"""
+        with self._hw_encoder_lock:
+            if self._hw_encoder is None:
+                self._hw_encoder = self._probe_hw_encoder()
+                self.logger.info(f"ビデオエンコーダ: {self._hw_encoder}")
+            encoder = self._hw_encoder
+        # --crf で目標サイズを上限として守れるGPUエンコーダはNVENCのみ。それ以外はlibx264のCRFにする
+        if self.crf is not None and encoder not in (self.CPU_ENCODER, 'h264_nvenc'):
+            return self.CPU_ENCODER
+        return encoder
+    
+    def _probe_hw_encoder(self) -> str:
+        """ハードウェアエンコーダを優先順に試し、使えなければlibx264を返す"""
+        if self.force_cpu:
+            return self.CPU_ENCODER
+        
+        caps = self._get_ffmpeg_caps()
+        for codec, hw in self.HW_ENCODERS.items():
+            if codec == 'h264_videotoolbox' and self.platform != 'Darwin':
+                continue
+            if codec not in caps.encoders:
+                continue
+            if hw['hwaccel'] is not None and hw['hwaccel'] not in caps.hwaccels:
+                continue
+            # ビルドに含まれていてもGPUやドライバがなければ使えないので、実際に試す
+            if self._hw_encoder_works(codec):
+                return codec
+        return self.CPU_ENCODER
+    
+    def _hw_encoder_works(self, codec: str) -> bool:
+        """短いテスト映像をエンコードしてハードウェアエンコーダが使えるか確認"""
+        hw = self.HW_ENCODERS[codec]
+        cmd = [
+            'ffmpeg',
+            '-hide_banner',
+            '-loglevel', 'error',
+            *hw['input_args'],
+            '-f', 'lavfi',
+            '-i', 'color=c=black:s=256x256:d=0.1',
+            *hw['filter_args'],
+            '-c:v', codec,
+            '-f', 'null',
+            '-'
+        ]
+        try:
+            subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=15,
+                check=True
+            )
+            return True
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+            return False
+    
+    def _hw_rate_args(self, codec: str, video_bitrate: int) -> List[str]:
+        """ハードウェアエンコーダ用の1パスVBRのレート制御引数"""
+        if codec == 'h264_videotoolbox':
+            return ['-b:v', f'{video_bitrate}k', '-allow_sw', '1']
         
-        if total > 1:
+        rate_args = [
+            '-b:v', f'{video_bitrate}k',
+            '-maxrate', f'{int(video_bitrate * 1.2)}k',
+            '-bufsize', f'{video_bitrate * 2}k',
+        ]
+        if codec == 'h264_nvenc':
+            return ['-rc', 'vbr', *rate_args, '-preset', 'p4']
+        return rate_args
+    
+    def _nvenc_quality_args(self, video_bitrate: int) -> List[str]:
+        """--crf 指定時のNVENC用の固定品質引数（目標サイズ由来のビットレートは上限としてのみ使う）"""
+        return [
+            '-rc', 'vbr', '-cq', str(self.crf), '-b:v', '0',
+            '-maxrate', f'{video_bitrate}k', '-bufsize', f'{video_bitrate * 2}k',
+            '-preset', 'p5',
+        ]
+    
+    def _select_preset(self, meta: VideoMeta, budget_seconds: Optional[float] = None) -> str:
+        """時間予算からx264のプリセットを選択（予算なしの場合は medium）"""
+        if budget_seconds is None or not (meta.has_video and meta.fps):
+            return self.DEFAULT_X264_PRESET
+        
+        pixel_rate = meta.width * meta.height * meta.fps / 1_000_000
+        
+        # 予算内に終わる最も遅い(高画質な)プリセットを選ぶ
+        total_mpx = pixel_rate * meta.duration * self._encode_pass_count()
+        costs = self._load_preset_costs()
+        for preset in reversed(self.X264_PRESETS):
+            if costs[preset] * total_mpx <= budget_seconds:
+                return preset
+        return self.X264_PRESETS[0]
+    
+    def _encode_pass_count(self) -> int:
+        """1ファイルあたりのエンコードパス数"""
+        return 1 if self.crf is not None else 2
+    
+    def _preset_table_path(self) -> Path:
+        return self.get_config_dir() / 'preset_table.json'
+    
+    def _load_preset_costs(self) -> dict:
+        """プリセットごとのエンコードコスト表を読み込む（初回のみファイルを読む）"""
+        with self._preset_costs_lock:
+            if self._preset_costs is None:
+                costs = dict(self.DEFAULT_PRESET_COSTS)
+                try:
+                    with open(self._preset_table_path(), encoding='utf-8') as f:
+                        saved = json.load(f)
+                    costs.update({
+                        preset: float(cost) for preset, cost in saved.items()
+                        if preset in costs and float(cost) > 0
+                    })
+                except FileNotFoundError:
+                    pass
+                except (OSError, ValueError, TypeError, AttributeError) as e:
+                    self.logger.warning(f"プリセット表の読み込み失敗: {e}")
+                self._preset_costs = costs
+            return self._preset_costs
+    
+    def _update_preset_cost(self, preset: str, elapsed_time: float, meta: VideoMeta):
+        """実測のエンコード時間でプリセットのコストをEWMA更新し、保存する"""
+        total_mpx = (meta.width * meta.height * meta.fps * meta.duration / 1_000_000
+                     * self._encode_pass_count())
+        if total_mpx <= 0 or elapsed_time <= 0:
+            return
+        
+        costs = self._load_preset_costs()
+        measured = elapsed_time / total_mpx
+        alpha = self.PRESET_COST_EWMA_ALPHA
+        with self._preset_costs_lock:
+            costs[preset] = alpha * measured + (1 - alpha) * costs[preset]
+            try:
+                with open(self._preset_table_path(), 'w', encoding='utf-8') as f:
+                    json.dump(costs, f, indent=2)
+            except OSError as e:
+                self.logger.warning(f"プリセット表の保存失敗: {e}")
+    
+    def compress_video(self, input_path: Path, output_path: Path, video_bitrate: int, 
+                      meta: VideoMeta, audio_bitrate: int, current: int = 1, total: int = 1,
+                      show_progress: bool = True):
+        """動画を圧縮(2パスエンコーディング、--crf 指定時は1パスCRF、GPU使用時は1パスVBR/固定品質)"""
+        
+        if self._board is not None:
+            # 並列実行中はジョブごとの進捗行にまとめて表示
+            self._board.start(threading.get_ident(), f"[{current}/{total}] {input_path.name}")
+        elif not show_progress:
+            # 進捗行を描画できない出力先では、バーが混ざるため開始行のみ表示
+            self._print_block([f"▶️  [{current}/{total}] {input_path.name} の圧縮を開始"])
+        elif total > 1:
             print(f"\n🎬 [{current}/{total}] {input_path.name} を圧縮中...")
         else:
             print(f"\n🎬 圧縮中です...")
-        print("=" * 60)
+        if show_progress:
+            print("=" * 60)
         
-        # プラットフォームに応じたnullデバイス
-        null_output = 'NUL' if self.platform == 'Windows' else '/dev/null'
+        try:
+            self._compress_with_encoder(input_path, output_path, video_bitrate,
+                                        meta, audio_bitrate, show_progress)
+        finally:
+            if self._board is not None:
+                self._board.finish(threading.get_ident())
+    
+    def _compress_with_encoder(self, input_path: Path, output_path: Path, video_bitrate: int,
+                               meta: VideoMeta, audio_bitrate: int, show_progress: bool = True):
+        """エンコーダに応じた圧縮方式を選んで実行"""
+        encoder = self._pick_video_encoder()
+        if encoder != self.CPU_ENCODER:
+            # ハードウェアエンコーダは2パスの恩恵が小さいので1パス
+            self._compress_single_pass_hw(input_path, output_path, video_bitrate,
+                                          meta, audio_bitrate, encoder, show_progress)
+            return
+        
+        preset = self._select_preset(meta, self.time_budget)
+        self.logger.info(f"プリセット選択: {input_path.name}, {preset}")
+        encode_start = time.monotonic()
         
+        if self.crf is not None:
+            self._compress_single_pass_crf(input_path, output_path, video_bitrate,
+                                           meta, audio_bitrate, preset, show_progress)
+        else:
+            self._compress_two_pass(input_path, output_path, video_bitrate,
+                                    meta, audio_bitrate, preset, show_progress)
+        
+        # 並列実行中はCPUを分け合っていて実測が遅く出るので、プリセット表を更新しない
+        if self._active_workers <= 1:
+            self._update_preset_cost(preset, time.monotonic() - encode_start, meta)
+    
+    def _compress_two_pass(self, input_path: Path, output_path: Path, video_bitrate: int,
+                           meta: VideoMeta, audio_bitrate: int, preset: str,
+                           show_progress: bool = True):
+        """ビットレート指定の2パス圧縮"""
+        # 2パス目で入力をディスクから読み直さずに済むよう先読みしておく
+        self._warm_page_cache(input_path)
+        
+        # 2パスログはエンコードごとの一時ディレクトリに置く（並列実行時の衝突防止）
+        passlog_dir = tempfile.mkdtemp(prefix='vc_2p_')
+        passlog = os.path.join(passlog_dir, 'ffmpeg2pass')
+        try:
+            self._run_two_passes(input_path, output_path, video_bitrate, meta,
+                                 audio_bitrate, preset, passlog, show_progress)
+        finally:
+            shutil.rmtree(passlog_dir, ignore_errors=True)
+    
+    def _run_two_passes(self, input_path: Path, output_path: Path, video_bitrate: int,
+                        meta: VideoMeta, audio_bitrate: int, preset: str, passlog: str,
+                        show_progress: bool = True):
+        """2パスエンコードの各パスを実行"""
         # 1パス目
-        print("\n[1/2] 1パス目: ビットレート解析中...")
+        # 統計ファイルの互換性を保つためプリセットは2パス目と揃える
+        # （解析の簡略化はlibx264ラッパーの既定 fastfirstpass=1 で行われる）
+        if show_progress:
+            print("\n[1/2] 1パス目: ビットレート解析中...")
         pass1_cmd = [
             'ffmpeg',
+            *self.FFMPEG_PROGRESS_ARGS,
             '-i', str(input_path),
             '-c:v', 'libx264',
+            '-preset', preset,
+            *self._gop_args(self.CPU_ENCODER),
             '-b:v', f'{video_bitrate}k',
             '-pass', '1',
+            '-passlogfile', passlog,
+            '-x264-params', self._x264_thread_params(),
             '-an',
             '-f', 'null',
             '-y',
-            null_output
+            _NULL_DEVICE
         ]
         
         try:
-            self._run_ffmpeg_with_progress(pass1_cmd, "1パス目", video_info)
+            self._run_ffmpeg_with_progress(pass1_cmd, "1パス目", meta, show_progress)
         except subprocess.CalledProcessError as e:
             self.logger.error(f"1パス目エンコード失敗: {input_path.name}, エラー: {e}")
             raise RuntimeError(f"1パス目のエンコードに失敗: {e}")
         
         # 2パス目
-        print("\n[2/2] 2パス目: 最終エンコード中...")
+        if show_progress:
+            print("\n[2/2] 2パス目: 最終エンコード中...")
         pass2_cmd = [
             'ffmpeg',
+            *self.FFMPEG_PROGRESS_ARGS,
             '-i', str(input_path),
             '-c:v', 'libx264',
+            '-preset', preset,
+            *self._gop_args(self.CPU_ENCODER),
             '-b:v', f'{video_bitrate}k',
             '-pass', '2',
+            '-passlogfile', passlog,
+            '-x264-params', self._x264_thread_params(),
             '-c:a', 'aac',
             '-b:a', f'{audio_bitrate}k',
+            *self._container_args(output_path),
             '-y',
             str(output_path)
         ]
         
         try:
-            self._run_ffmpeg_with_progress(pass2_cmd, "2パス目", video_info)
+            self._run_ffmpeg_with_progress(pass2_cmd, "2パス目", meta, show_progress)
         except subprocess.CalledProcessError as e:
             self.logger.error(f"2パス目エンコード失敗: {input_path.name}, エラー: {e}")
             raise RuntimeError(f"2パス目のエンコードに失敗: {e}")
+    
+    def _compress_single_pass_hw(self, input_path: Path, output_path: Path, video_bitrate: int,
+                                 meta: VideoMeta, audio_bitrate: int, encoder: str,
+                                 show_progress: bool = True):
+        """ハードウェアエンコーダで1パス圧縮（--crf 指定時はNVENCの固定品質、それ以外はVBR）"""
+        if show_progress:
+            print(f"\n[1/1] {encoder}: エンコード中...")
+        hw = self.HW_ENCODERS[encoder]
+        if self.crf is not None:
+            # --crf でGPUが選ばれるのはNVENCのみ（_pick_video_encoder 参照）
+            rate_args = self._nvenc_quality_args(video_bitrate)
+        else:
+            rate_args = self._hw_rate_args(encoder, video_bitrate)
+        cmd = [
+            'ffmpeg',
+            *self.FFMPEG_PROGRESS_ARGS,
+            *hw['input_args'],
+            '-i', str(input_path),
+            *hw['filter_args'],
+            '-c:v', encoder,
+            *rate_args,
+            *self._gop_args(encoder),
+            '-c:a', 'aac',
+            '-b:a', f'{audio_bitrate}k',
+            *self._container_args(output_path),
+            '-y',
+            str(output_path)
+        ]
+        
+        try:
+            self._run_ffmpeg_with_progress(cmd, encoder, meta, show_progress)
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"{encoder}エンコード失敗: {input_path.name}, エラー: {e}")
+            raise RuntimeError(f"{encoder}でのエンコードに失敗: {e}")
+    
+    def _gop_args(self, encoder: str) -> List[str]:
+        """--fast-seek 用の固定GOP引数（キーフレームを等間隔にし、Bフレームを使わない）"""
+        if not self.fast_seek:
+            return []
+        gop = str(self.FAST_SEEK_GOP)
+        if encoder == self.CPU_ENCODER:
+            return ['-g', gop, '-keyint_min', gop, '-sc_threshold', '0', '-bf', '0']
+        if encoder == 'h264_videotoolbox':
+            # VideoToolboxは既定でBフレームを使わない
+            return ['-g', gop]
+        return ['-g', gop, '-bf', '0']
+    
+    def _x264_thread_params(self) -> str:
+        """x264のスレッド設定（並列実行中はCPUコアをジョブ数で分け合う）"""
+        if self._active_workers <= 1:
+            threads = 'auto'
+        else:
+            threads = max(1, (os.cpu_count() or 1) // self._active_workers)
+        return f'threads={threads}:sliced-threads=0'
+    
+    def _container_args(self, output_path: Path) -> List[str]:
+        """出力コンテナ向けの追加引数（MP4系はmoovを先頭に置いて途中から再生できるようにする）"""
+        if output_path.suffix.lower() in self.FASTSTART_FORMATS:
+            return ['-movflags', '+faststart']
+        return []
+    
+    def _warm_page_cache(self, path: Path):
+        """入力ファイルをOSのページキャッシュへ先読みさせる
         
-        self._cleanup_ffmpeg_logs()
+        ファイル全体がメモリに収まる場合のみ効果がある（収まらない場合は単に無駄な読み込みになる）。
+        posix_fadvise のないmacOS/Windowsでは何もしない（1パス目が先頭から順に読むので、それで十分）。
+        """
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                # アドバイスはビットフラグではないので個別に指定する
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            self.logger.warning(f"ページキャッシュの先読み失敗: {path.name}, エラー: {e}")
     
-    def _run_ffmpeg_with_progress(self, cmd: list, phase: str, video_info: dict):
+    def _compress_single_pass_crf(self, input_path: Path, output_path: Path, video_bitrate: int,
+                                  meta: VideoMeta, audio_bitrate: int, preset: str,
+                                  show_progress: bool = True):
+        """CRFで1パス圧縮（目標サイズ由来のビットレートは上限としてのみ使う）"""
+        if show_progress:
+            print(f"\n[1/1] CRF {self.crf}: エンコード中...")
+        cmd = [
+            'ffmpeg',
+            *self.FFMPEG_PROGRESS_ARGS,
+            '-i', str(input_path),
+            '-c:v', 'libx264',
+            '-preset', preset,
+            *self._gop_args(self.CPU_ENCODER),
+            '-crf', str(self.crf),
+            '-maxrate', f'{video_bitrate}k',
+            '-bufsize', f'{video_bitrate * 2}k',
+            '-x264-params', self._x264_thread_params(),
+            '-c:a', 'aac',
+            '-b:a', f'{audio_bitrate}k',
+            *self._container_args(output_path),
+            '-y',
+            str(output_path)
+        ]
+        
+        try:
+            self._run_ffmpeg_with_progress(cmd, "CRF", meta, show_progress)
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"CRFエンコード失敗: {input_path.name}, エラー: {e}")
+            raise RuntimeError(f"CRFエンコードに失敗: {e}")
+    
+    def _run_ffmpeg_with_progress(self, cmd: list, phase: str, meta: VideoMeta,
+                                  show_progress: bool = True):
         """ffmpegを実行し、進捗を表示"""
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True
+        # 中断フラグの確認と登録を同じロック内で行い、終了処理の後に起動されるのを防ぐ
+        with self._active_procs_lock:
+            if self._cancelled:
+                raise RuntimeError("中断されたためffmpegを起動しません")
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=self.FFMPEG_PIPE_BUFSIZE,
+                creationflags=_FFMPEG_CREATIONFLAGS
+            )
+            self._active_procs.add(process)
+        try:
+            self._watch_ffmpeg(process, cmd, phase, meta, show_progress)
+        finally:
+            with self._active_procs_lock:
+                self._active_procs.discard(process)
+    
+    def _watch_ffmpeg(self, process: subprocess.Popen, cmd: list, phase: str, meta: VideoMeta,
+                      show_progress: bool = True):
+        """ffmpegの出力を読んで進捗を表示し、終了を待つ"""
+        # stderrは別スレッドで読み続け、末尾の行だけ保持する
+        # （溜めるとメモリを食い、読まないとパイプが詰まってffmpegが止まる）
+        stderr_tail = deque(maxlen=self.FFMPEG_STDERR_TAIL_LINES)
+        stderr_reader = threading.Thread(
+            target=stderr_tail.extend, args=(process.stderr,), daemon=True
         )
+        stderr_reader.start()
         
-        duration = float(video_info['format']['duration'])
+        # 進捗計算はミリ秒・千分率の整数で行う
+        duration_ms = max(1, meta.duration_ms)
+        last_paint = 0.0
+        board = None if show_progress else self._board
+        board_key = threading.get_ident()
         
-        while True:
-            line = process.stderr.readline()
-            if not line and process.poll() is not None:
-                break
+        for line in process.stdout:
+            if not (show_progress or board) or not line.startswith(b'out_time_us='):
+                continue
             
-            time_match = re.search(r'time=(\d{2}):(\d{2}):(\d{2}\.\d{2})', line)
-            if time_match:
-                hours, minutes, seconds = time_match.groups()
-                current_time = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
-                progress = min(100, (current_time / duration) * 100)
-                
-                bar_length = 40
-                filled = int(bar_length * progress / 100)
-                bar = '█' * filled + '░' * (bar_length - filled)
-                
-                if progress > 0:
-                    elapsed = current_time
-                    total_estimated = (elapsed / progress) * 100
-                    remaining = total_estimated - elapsed
-                    remaining_str = self._format_time(remaining)
-                else:
-                    remaining_str = "計算中..."
-                
-                print(f'\r{phase}: [{bar}] {progress:5.1f}% | 残り時間: {remaining_str}', end='', flush=True)
+            try:
+                current_ms = max(0, int(line[12:]) // 1000)
+            except ValueError:
+                # 開始直後は N/A が出力される
+                continue
+            progress_permille = min(1000, current_ms * 1000 // duration_ms)
+            
+            # 再描画は一定間隔に間引く（100%だけは必ず表示）
+            now = time.monotonic()
+            if progress_permille < 1000 and now - last_paint < self.PROGRESS_REPAINT_INTERVAL:
+                continue
+            last_paint = now
+            
+            if board is not None:
+                # 端末によって幅の変わる █ ░ は使わず、行の幅を確定させる
+                board.update(board_key,
+                             self._progress_text(phase, current_ms, progress_permille, 20, '#', '-'),
+                             force=progress_permille == 1000)
+            else:
+                print('\r' + self._progress_text(phase, current_ms, progress_permille, 40),
+                      end='', flush=True)
         
-        print()
+        process.wait()
+        stderr_reader.join()
+        stderr = b''.join(stderr_tail).decode('utf-8', errors='replace').strip()
+        
+        if show_progress:
+            print()
         
         if process.returncode != 0:
-            raise subprocess.CalledProcessError(process.returncode, cmd)
+            if stderr:
+                self.logger.error(f"ffmpegエラー出力: {stderr}")
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
     
-    def _format_time(self, seconds: float) -> str:
-        """秒を 'HH:MM:SS' 形式に変換"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    def cancel(self):
+        """処理を中断する（待機中のジョブを取り消し、実行中のffmpegを終了させる）"""
+        with self._active_procs_lock:
+            self._cancelled = True
+        for future in list(self._pending_futures):
+            future.cancel()
+        self.terminate_ffmpeg()
     
-    def _cleanup_ffmpeg_logs(self):
-        """ffmpegの2パスエンコードで生成されるログファイルを削除"""
-        log_files = ['ffmpeg2pass-0.log', 'ffmpeg2pass-0.log.mbtree']
-        for log_file in log_files:
+    def terminate_ffmpeg(self):
+        """実行中のffmpegを終了させる（出力を書き終えさせ、応答がなければ強制終了）
+
+        POSIXではSIGTERM、WindowsではCTRL_BREAK_EVENTを送る（どちらもffmpegは正常終了処理を行う）。
+        """
+        with self._active_procs_lock:
+            procs = list(self._active_procs)
+        for process in procs:
             try:
-                if os.path.exists(log_file):
-                    os.remove(log_file)
-            except Exception:
+                if _PLATFORM == 'Windows':
+                    process.send_signal(signal.CTRL_BREAK_EVENT)
+                else:
+                    process.terminate()
+            except OSError:
+                # 既に終了している
                 pass
+        deadline = time.monotonic() + self.FFMPEG_TERMINATE_TIMEOUT
+        for process in procs:
+            try:
+                process.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if procs:
+            self.logger.warning(f"中断によりffmpegを終了: {len(procs)}プロセス")
+    
+    def _progress_text(self, phase: str, current_ms: int, progress_permille: int,
+                       bar_length: int, fill: str = '█', empty: str = '░') -> str:
+        """進捗バー1行分の文字列を生成"""
+        filled = bar_length * progress_permille // 1000
+        bar = fill * filled + empty * (bar_length - filled)
+        
+        if progress_permille == 0:
+            remaining_str = "計算中..."
+        else:
+            remaining_ms = current_ms * 1000 // progress_permille - current_ms
+            remaining_str = self._format_time(remaining_ms)
+        
+        percent, tenths = divmod(progress_permille, 10)
+        return f'{phase}: [{bar}] {percent:3d}.{tenths}% | 残り時間: {remaining_str}'
     
-    def run(self):
-        """メイン処理"""
+    def _print_block(self, lines: List[str]):
+        """複数行をまとめて出力（並列実行時に他スレッドの出力と混ざらないようロックする）"""
+        if self._board is not None:
+            self._board.write_above('\n'.join(lines))
+            return
+        with self._print_lock:
+            print('\n'.join(lines), flush=True)
+    
+    def _format_time(self, ms: int) -> str:
+        """ミリ秒を 'HH:MM:SS' 形式に変換"""
+        hours, rem = divmod(ms // 1000, 3600)
+        minutes, secs = divmod(rem, 60)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    
+    def run(self, input_files: Optional[List[Path]] = None):
+        """メイン処理（input_files を渡した場合はフェーズ1を飛ばす）"""
         self.logger.info("=" * 60)
         self.logger.info(f"動画圧縮ツール v{__version__} 起動 (Platform: {self.platform})")
         if self.dry_run:
             self.logger.info("モード: ドライラン")
         
         # フェーズ1: ファイル/ディレクトリパス入力
-        self.input_files = self._phase1_get_input_files()
+        self.input_files = input_files or self._phase1_get_input_files()
         
         # バッチモード判定
         self.batch_mode = len(self.input_files) > 1
@@ -381,10 +1236,10 @@ Arch:
     def _run_single_mode(self):
         """単体ファイルモード"""
         input_path = self.input_files[0]
-        video_info = self.get_video_info(input_path)
+        job = FileJob(input_path, self.get_file_size_mb(input_path), self.get_video_meta(input_path))
         
         # フェーズ2: 目標サイズ入力
-        target_size_mb = self._phase2_get_target_size(input_path, video_info)
+        target_size_mb = self._phase2_get_target_size(job)
         
         # フェーズ2.5: 画質モード選択
         quality_mode = self._phase2_5_select_quality_mode()
@@ -394,16 +1249,19 @@ Arch:
         
         # フェーズ4 & 5: 圧縮実行 or ドライラン
         if self.dry_run:
-            self._dry_run_report(input_path, target_size_mb, output_format, video_info, quality_mode)
+            self._dry_run_report(job, target_size_mb, output_format, quality_mode)
         else:
-            self._compress_and_report(input_path, target_size_mb, output_format, video_info, quality_mode)
+            self._compress_and_report(job, target_size_mb, output_format, quality_mode)
     
     def _run_batch_mode(self):
         """バッチ処理モード"""
-        print(f"\n📁 {len(self.input_files)}個の動画ファイルが見つかりました:")
-        for i, file_path in enumerate(self.input_files, 1):
-            size_mb = self.get_file_size_mb(file_path)
-            print(f"  {i}. {file_path.name} ({size_mb:.2f} MB)")
+        # 動画情報(ffprobe)は設定を聞いている間に裏で取得しておく
+        metadata_future = self._start_metadata_prefetch(self.input_files)
+        file_jobs = self._load_file_jobs(self.input_files)
+        
+        print(f"\n📁 {len(file_jobs)}個の動画ファイルが見つかりました:")
+        for i, job in enumerate(file_jobs, 1):
+            print(f"  {i}. {job.path.name} ({job.size_mb:.2f} MB)")
         
         # 一括設定 or 個別設定
         print("\n設定方法を選択してください:")
@@ -417,11 +1275,12 @@ Arch:
             print("❌ エラー: 1 または 2 を入力してください。")
         
         if choice == '1':
-            self._batch_mode_uniform()
+            self._batch_mode_uniform(file_jobs, metadata_future)
         else:
-            self._batch_mode_individual()
+            self._batch_mode_individual(file_jobs, metadata_future)
     
-    def _batch_mode_uniform(self):
+    def _batch_mode_uniform(self, file_jobs: List[FileJob],
+                            metadata_future: 'Future[Dict[Path, VideoMeta]]'):
         """一括設定モード"""
         print("\n【一括設定モード】")
         print("全てのファイルに同じ設定を適用します。")
@@ -460,31 +1319,11 @@ Arch:
             output_format = None
         
         # 全ファイルを処理
-        total = len(self.input_files)
-        success_count = 0
-        fail_count = 0
-        
-        for i, input_path in enumerate(self.input_files, 1):
-            try:
-                video_info = self.get_video_info(input_path)
-                current_format = output_format if output_format else input_path.suffix[1:]
-                
-                if self.dry_run:
-                    self._dry_run_report(input_path, target_size_mb, current_format, 
-                                        video_info, quality_mode, current=i, total=total)
-                    success_count += 1
-                else:
-                    self._compress_and_report(input_path, target_size_mb, current_format, 
-                                            video_info, quality_mode, current=i, total=total)
-                    success_count += 1
-            except Exception as e:
-                fail_count += 1
-                print(f"\n❌ エラー: {input_path.name} の処理に失敗: {e}")
-                self.logger.error(f"処理失敗: {input_path.name}, エラー: {e}")
-                if not self.dry_run:
-                    continue_choice = input("続けますか？ (y/n): ").strip().lower()
-                    if continue_choice != 'y':
-                        break
+        self._attach_metadata(file_jobs, metadata_future.result())
+        settings = CompressSettings(target_size_mb, quality_mode, output_format)
+        jobs = [(job, settings) for job in file_jobs]
+        total = len(jobs)
+        success_count, fail_count = self._execute_jobs(jobs)
         
         if self.dry_run:
             print(f"\n✅ ドライラン完了! {total}個のファイルをシミュレートしました。")
@@ -493,22 +1332,28 @@ Arch:
             print(f"\n🎉 バッチ処理完了! 成功: {success_count}, 失敗: {fail_count}")
             self.logger.info(f"バッチ処理完了: 成功 {success_count}, 失敗 {fail_count}")
     
-    def _batch_mode_individual(self):
+    def _batch_mode_individual(self, file_jobs: List[FileJob],
+                               metadata_future: 'Future[Dict[Path, VideoMeta]]'):
         """個別設定モード"""
         print("\n【個別設定モード】")
         
-        total = len(self.input_files)
-        success_count = 0
+        # 最初のファイルから動画の長さを表示するので、ここで先読みの完了を待つ
+        self._attach_metadata(file_jobs, metadata_future.result())
+        
+        total = len(file_jobs)
         fail_count = 0
         skip_count = 0
+        jobs = []
         
-        for i, input_path in enumerate(self.input_files, 1):
+        # 先に全ファイルの設定を聞いておき、圧縮はまとめて実行する
+        for i, job in enumerate(file_jobs, 1):
+            input_path = job.path
             try:
                 print(f"\n{'='*60}")
                 print(f"[{i}/{total}] {input_path.name}")
                 print('='*60)
                 
-                video_info = self.get_video_info(input_path)
+                self._ensure_meta(job)
                 
                 # スキップオプション
                 skip = input("このファイルをスキップしますか？ (y/n): ").strip().lower()
@@ -519,7 +1364,7 @@ Arch:
                     continue
                 
                 # 目標サイズ入力
-                target_size_mb = self._phase2_get_target_size(input_path, video_info)
+                target_size_mb = self._phase2_get_target_size(job)
                 
                 # 画質モード選択
                 quality_mode = self._phase2_5_select_quality_mode()
@@ -527,24 +1372,17 @@ Arch:
                 # 拡張子変換
                 output_format = self._phase3_convert_format(input_path)
                 
-                # 圧縮実行 or ドライラン
-                if self.dry_run:
-                    self._dry_run_report(input_path, target_size_mb, output_format, 
-                                        video_info, quality_mode, current=i, total=total)
-                    success_count += 1
-                else:
-                    self._compress_and_report(input_path, target_size_mb, output_format, 
-                                            video_info, quality_mode, current=i, total=total)
-                    success_count += 1
+                settings = CompressSettings(target_size_mb, quality_mode, output_format)
+                jobs.append((job, settings))
                 
             except Exception as e:
                 fail_count += 1
                 print(f"\n❌ エラー: {input_path.name} の処理に失敗: {e}")
                 self.logger.error(f"処理失敗: {input_path.name}, エラー: {e}")
-                if not self.dry_run:
-                    continue_choice = input("続けますか？ (y/n): ").strip().lower()
-                    if continue_choice != 'y':
-                        break
+        
+        # 圧縮実行 or ドライラン
+        success_count, job_fail_count = self._execute_jobs(jobs)
+        fail_count += job_fail_count
         
         if self.dry_run:
             print(f"\n✅ ドライラン完了! 成功: {success_count}, スキップ: {skip_count}, 失敗: {fail_count}")
@@ -553,12 +1391,116 @@ Arch:
             print(f"\n🎉 バッチ処理完了! 成功: {success_count}, スキップ: {skip_count}, 失敗: {fail_count}")
             self.logger.info(f"バッチ処理完了: 成功 {success_count}, スキップ {skip_count}, 失敗 {fail_count}")
     
-    def _dry_run_report(self, input_path: Path, target_size_mb: float, 
-                       output_format: str, video_info: dict, quality_mode: str,
+    def _worker_count(self, total: int) -> int:
+        """並列実行するffmpegの数を決定"""
+        if self.jobs:
+            workers = self.jobs
+        elif self._pick_video_encoder() != self.CPU_ENCODER:
+            # GPUの同時エンコードセッション数には上限がある
+            workers = self.HW_ENCODER_MAX_JOBS
+        else:
+            # 1ジョブ数スレッドに抑えて複数本走らせる方が、全コアで1本ずつより速い
+            workers = (os.cpu_count() or 1) // self.X264_THREADS_PER_JOB
+        return max(1, min(total, workers))
+    
+    def _execute_jobs(self, jobs: List[Tuple[FileJob, CompressSettings]]) -> Tuple[int, int]:
+        """ジョブ一覧を処理し、(成功数, 失敗数) を返す"""
+        if not jobs:
+            return 0, 0
+        
+        # ドライランは計算のみなので逐次実行で十分
+        if self.dry_run or self._worker_count(len(jobs)) == 1:
+            return self._execute_jobs_sequential(jobs)
+        return self._execute_jobs_parallel(jobs)
+    
+    def _execute_jobs_sequential(self, jobs: List[Tuple[FileJob, CompressSettings]]) -> Tuple[int, int]:
+        """ジョブを1つずつ処理（失敗時は続行するか確認）"""
+        total = len(jobs)
+        success_count = 0
+        fail_count = 0
+        
+        for i, (job, settings) in enumerate(jobs, 1):
+            success, error = self._process_one(job, settings, current=i, total=total)
+            if success:
+                success_count += 1
+                continue
+            
+            fail_count += 1
+            print(f"\n❌ エラー: {job.path.name} の処理に失敗: {error}")
+            if not self.dry_run and not self.confirm("続けますか？ (y/n): "):
+                break
+        
+        return success_count, fail_count
+    
+    def _execute_jobs_parallel(self, jobs: List[Tuple[FileJob, CompressSettings]]) -> Tuple[int, int]:
+        """複数のffmpegを同時に起動して処理（失敗しても残りは続行）"""
+        total = len(jobs)
+        workers = self._worker_count(total)
+        success_count = 0
+        fail_count = 0
+        
+        print(f"\n🚀 {workers}並列で{total}個のファイルを処理します...")
+        self.logger.info(f"並列処理開始: {total}個のファイル, {workers}並列")
+        
+        # ffmpeg自体は別プロセスなので、待ち受けはスレッドで十分
+        self._active_workers = workers
+        if sys.stdout.isatty() and _enable_ansi_escapes():
+            self._board = _ProgressBoard(self.PROGRESS_REPAINT_INTERVAL)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._process_one, job, settings,
+                                    current=i, total=total, show_progress=False): job
+                    for i, (job, settings) in enumerate(jobs, 1)
+                }
+                # 中断時に未開始のジョブを取り消せるよう保持する
+                self._pending_futures = list(futures)
+                for future in as_completed(futures):
+                    job = futures[future]
+                    success, error = future.result()
+                    if success:
+                        success_count += 1
+                    else:
+                        fail_count += 1
+                        self._print_block([f"\n❌ エラー: {job.path.name} の処理に失敗: {error}"])
+                    self._print_block([f"📦 進捗: {success_count + fail_count}/{total} 完了"])
+        finally:
+            self._pending_futures = []
+            self._active_workers = 1
+            self._board = None
+        
+        return success_count, fail_count
+    
+    def _process_one(self, job: FileJob, settings: CompressSettings,
+                     current: int = 1, total: int = 1,
+                     show_progress: bool = True) -> Tuple[bool, Optional[str]]:
+        """1ファイルを処理し、(成功したか, エラーメッセージ) を返す"""
+        if self._cancelled:
+            return False, "中断されました"
+        try:
+            self._ensure_meta(job)
+            output_format = settings.output_format if settings.output_format else job.path.suffix[1:]
+            
+            if self.dry_run:
+                self._dry_run_report(job, settings.target_size_mb, output_format,
+                                     settings.quality_mode, current=current, total=total)
+            else:
+                self._compress_and_report(job, settings.target_size_mb, output_format,
+                                          settings.quality_mode, current=current, total=total,
+                                          show_progress=show_progress)
+            return True, None
+        except Exception as e:
+            self.logger.error(f"処理失敗: {job.path.name}, エラー: {e}")
+            return False, str(e)
+    
+    def _dry_run_report(self, job: FileJob, target_size_mb: float, 
+                       output_format: str, quality_mode: str,
                        current: int = 1, total: int = 1):
         """ドライラン結果レポート"""
-        current_size = self.get_file_size_mb(input_path)
-        duration = float(video_info['format']['duration'])
+        input_path = job.path
+        meta = job.meta
+        current_size = job.size_mb
+        duration = meta.duration
         audio_bitrate = self.get_audio_bitrate_for_mode(quality_mode)
         
         try:
@@ -568,7 +1510,7 @@ Arch:
             self.logger.warning(f"ドライラン: {input_path.name}, エラー: {e}")
             return
         
-        quality_level = self.estimate_quality_level(video_bitrate, video_info)
+        quality_level = self.estimate_quality_level(video_bitrate, meta)
         compression_ratio = (1 - target_size_mb / current_size) * 100
         
         timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
@@ -586,7 +1528,7 @@ Arch:
         print(f"現在のサイズ: {current_size:.2f} MB")
         print(f"目標サイズ: {target_size_mb:.2f} MB")
         print(f"圧縮率: {compression_ratio:.1f}%")
-        print(f"動画の長さ: {self._format_time(duration)}")
+        print(f"動画の長さ: {self._format_time(meta.duration_ms)}")
         print()
         print("【画質モード】")
         print(f"  {mode_info['name']}: {mode_info['description']}")
@@ -594,7 +1536,18 @@ Arch:
         print("【エンコード設定】")
         print(f"  ビデオビットレート: {video_bitrate} kbps")
         print(f"  音声ビットレート: {audio_bitrate} kbps (AAC)")
-        print(f"  コーデック: H.264 (libx264)")
+        encoder = self._pick_video_encoder()
+        print(f"  コーデック: H.264 ({encoder})")
+        if encoder != self.CPU_ENCODER and self.crf is not None:
+            print(f"  エンコード方式: 1パス 固定品質 CQ {self.crf} (ビットレート上限 {video_bitrate} kbps, ハードウェアエンコード)")
+        elif encoder != self.CPU_ENCODER:
+            print(f"  エンコード方式: 1パス VBR (ハードウェアエンコード)")
+        elif self.crf is not None:
+            print(f"  プリセット: {self._select_preset(meta, self.time_budget)}")
+            print(f"  エンコード方式: 1パス CRF {self.crf} (ビットレート上限 {video_bitrate} kbps)")
+        else:
+            print(f"  プリセット: {self._select_preset(meta, self.time_budget)}")
+            print(f"  エンコード方式: 2パス (ビットレート指定)")
         print()
         print("【予想画質】")
         print(f"  {quality_level}")
@@ -619,14 +1572,14 @@ Arch:
         if total == 1:
             print("\n💡 実際に圧縮する場合は --dry-run オプションを外して実行してください。")
     
-    def _compress_and_report(self, input_path: Path, target_size_mb: float, 
-                            output_format: str, video_info: dict, quality_mode: str,
-                            current: int = 1, total: int = 1):
+    def _compress_and_report(self, job: FileJob, target_size_mb: float, 
+                            output_format: str, quality_mode: str,
+                            current: int = 1, total: int = 1, show_progress: bool = True):
         """圧縮実行と結果レポート"""
-        import time
-        
-        current_size = self.get_file_size_mb(input_path)
-        duration = float(video_info['format']['duration'])
+        input_path = job.path
+        meta = job.meta
+        current_size = job.size_mb
+        duration = meta.duration
         audio_bitrate = self.get_audio_bitrate_for_mode(quality_mode)
         
         # 処理開始時刻記録
@@ -663,31 +1616,34 @@ Arch:
         
         # 圧縮実行
         try:
-            self.compress_video(input_path, output_path, video_bitrate, video_info, audio_bitrate, current, total)
+            self.compress_video(input_path, output_path, video_bitrate, meta, audio_bitrate,
+                                current, total, show_progress)
         except Exception as e:
             self.logger.error(f"圧縮失敗: {input_path.name}, エラー: {e}")
             raise
         
         # 処理時間計算
-        elapsed_time = time.time() - start_time
+        elapsed_ms = int((time.time() - start_time) * 1000)
         
         # 完了レポート
         final_size = self.get_file_size_mb(output_path)
         compression_ratio = (1 - final_size / current_size) * 100
         size_diff = abs(final_size - target_size_mb)
         
-        print("\n" + "=" * 60)
-        print("✅ 圧縮が完了し、圧縮した動画ファイルは保存されました!")
-        print("=" * 60)
-        print(f"画質モード: {mode_info['name']}")
-        print(f"ファイル名: {output_name}")
-        print(f"保存先: {output_path}")
-        print(f"目標サイズ: {target_size_mb:.2f} MB")
-        print(f"実際のサイズ: {final_size:.2f} MB")
-        print(f"差分: {size_diff:.2f} MB")
-        print(f"圧縮率: {compression_ratio:.1f}%")
-        print(f"処理時間: {self._format_time(elapsed_time)}")
-        print("=" * 60)
+        self._print_block([
+            "\n" + "=" * 60,
+            "✅ 圧縮が完了し、圧縮した動画ファイルは保存されました!",
+            "=" * 60,
+            f"画質モード: {mode_info['name']}",
+            f"ファイル名: {output_name}",
+            f"保存先: {output_path}",
+            f"目標サイズ: {target_size_mb:.2f} MB",
+            f"実際のサイズ: {final_size:.2f} MB",
+            f"差分: {size_diff:.2f} MB",
+            f"圧縮率: {compression_ratio:.1f}%",
+            f"処理時間: {self._format_time(elapsed_ms)}",
+            "=" * 60,
+        ])
         
         # ログ: 処理完了
         self.logger.info(
@@ -698,51 +1654,71 @@ Arch:
             f"実際サイズ: {final_size:.2f}MB, "
             f"差分: {size_diff:.2f}MB, "
             f"圧縮率: {compression_ratio:.1f}%, "
-            f"処理時間: {self._format_time(elapsed_time)}"
+            f"処理時間: {self._format_time(elapsed_ms)}"
         )
     
     def _phase1_get_input_files(self) -> List[Path]:
         """フェーズ1: ファイル/ディレクトリパス取得"""
         print("\n【フェーズ1】")
         while True:
-            path_str = input("動画ファイルまたはディレクトリのパスを入力し、エンターを押してください:\n> ").strip()
-            path_str = path_str.strip("'\"")
-            path = Path(path_str).expanduser()
-            
-            if not path.exists():
-                print(f"❌ エラー: 存在しないパスです。正しいパスを入力してください。")
-                continue
-            
-            # ディレクトリの場合
-            if path.is_dir():
-                video_files = self.get_video_files_from_directory(path)
-                if not video_files:
-                    print(f"❌ エラー: このディレクトリには動画ファイルが見つかりませんでした。")
-                    print(f"サポート形式: {', '.join(self.SUPPORTED_FORMATS)}")
-                    continue
-                return video_files
-            
-            # ファイルの場合
-            if not path.is_file():
-                print(f"❌ エラー: ファイルまたはディレクトリを指定してください。")
-                continue
-            
-            if path.suffix.lower() not in self.SUPPORTED_FORMATS:
-                print(f"❌ エラー: サポートされていない形式です。")
-                print(f"サポート形式: {', '.join(self.SUPPORTED_FORMATS)}")
-                continue
-            
-            return [path]
+            path_str = input("動画ファイル・ディレクトリのパス、またはワイルドカード(*.mp4 など)を入力し、エンターを押してください:\n> ")
+            try:
+                return self.resolve_input_files(path_str)
+            except ValueError as e:
+                print(f"❌ エラー: {e}")
+    
+    def resolve_input_files(self, path_str: str) -> List[Path]:
+        """ファイル・ディレクトリ・ワイルドカードから処理対象の動画ファイル一覧を取得
+        
+        対象が見つからない場合はValueError（メッセージはそのまま表示できる形）を送出する。
+        """
+        path_str = path_str.strip().strip("'\"")
+        path = Path(path_str).expanduser()
+        
+        # ワイルドカードの場合は一致したファイルをまとめて処理
+        if not path.exists() and any(c in path_str for c in '*?['):
+            video_files = self.get_video_files_from_pattern(path_str)
+            if not video_files:
+                raise ValueError(f"パターンに一致する動画ファイルが見つかりませんでした。\n{self._supported_formats_str}")
+            return video_files
+        
+        if not path.exists():
+            raise ValueError("存在しないパスです。正しいパスを入力してください。")
+        
+        # ディレクトリの場合
+        if path.is_dir():
+            video_files = self.get_video_files_from_directory(path)
+            if not video_files:
+                raise ValueError(f"このディレクトリには動画ファイルが見つかりませんでした。\n{self._supported_formats_str}")
+            return video_files
+        
+        # ファイルの場合
+        if not path.is_file():
+            raise ValueError("ファイルまたはディレクトリを指定してください。")
+        
+        if path.suffix.lower() not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"サポートされていない形式です。\n{self._supported_formats_str}")
+        
+        return [path]
     
-    def _phase2_get_target_size(self, input_path: Path, video_info: dict) -> float:
+    def confirm(self, prompt: str) -> bool:
+        """y/nで確認（--yes 指定時は常にy、標準入力が端末でない場合は常にn）"""
+        if self.assume_yes or not sys.stdin.isatty():
+            answer = 'y' if self.assume_yes else 'n'
+            print(f"{prompt}{answer}")
+            return self.assume_yes
+        # 先頭の1文字だけ見る（y / Y / yes などを受け付ける）
+        return input(prompt).lstrip()[:1].lower() == 'y'
+    
+    def _phase2_get_target_size(self, job: FileJob) -> float:
         """フェーズ2: 目標サイズ入力"""
-        current_size = self.get_file_size_mb(input_path)
-        duration = float(video_info['format']['duration'])
+        input_path = job.path
+        current_size = job.size_mb
         
         print("\n【フェーズ2】")
         print(f"ファイル名: {input_path.name}")
         print(f"現在のファイル容量: {current_size:.2f} MB")
-        print(f"動画の長さ: {self._format_time(duration)}")
+        print(f"動画の長さ: {self._format_time(job.meta.duration_ms)}")
         
         while True:
             try:
@@ -765,34 +1741,17 @@ Arch:
     
     def _phase2_5_select_quality_mode(self) -> str:
         """フェーズ2.5: 画質モード選択"""
-        print("\n【フェーズ2.5】画質モード選択")
-        print("どのモードで圧縮しますか？")
-        print()
-        print("  1. 音質優先 (音声192kbps)")
-        print("     音楽、講演、ASMR などの音が重要なコンテンツ向け")
-        print()
-        print("  2. 画質優先 (音声128kbps)")
-        print("     アニメ、映画、ゲーム実況 などの映像が重要なコンテンツ向け")
-        print()
-        print("  3. バランス (音声160kbps)")
-        print("     一般的な動画向け。音質と画質のバランスが取れた設定")
-        print()
-        
-        mode_map = {
-            '1': QualityMode.AUDIO_PRIORITY,
-            '2': QualityMode.VIDEO_PRIORITY,
-            '3': QualityMode.BALANCED
-        }
+        print(self.QUALITY_MODE_MENU)
         
         while True:
-            choice = input("番号を選択してください (デフォルト: 1): ").strip()
+            choice = input(self.QUALITY_MODE_PROMPT).strip()
             
             # デフォルト値
             if not choice:
                 choice = '1'
             
-            if choice in mode_map:
-                selected_mode = mode_map[choice]
+            if choice in self.QUALITY_MODE_CHOICES:
+                selected_mode = self.QUALITY_MODE_CHOICES[choice]
                 mode_info = QualityMode.MODES[selected_mode]
                 print(f"\n✅ {mode_info['name']}モードを選択しました。")
                 self.logger.info(f"画質モード選択: {mode_info['name']}")
@@ -828,81 +1787,240 @@ Arch:
         self.start_time = None
 
 
+# 起動時・終了時に出す定型文（行ごとにprintせず、まとめて1回で書き出す）
+_HELP_TEXT = f"""動画圧縮ツール - 使い方
+
+使用法:
+  python compress_video.py              通常モード
+  python compress_video.py --dry-run    ドライランモード
+  python compress_video.py --jobs 4     バッチ処理を4並列で実行
+  python compress_video.py --crf 23     1パスCRFで高速に圧縮
+  python compress_video.py --batch "videos/*.mp4"  パス入力を省略して一括処理
+  python compress_video.py --version    バージョン表示
+  python compress_video.py --help       ヘルプ表示
+
+オプション:
+  --dry-run, -d    実際の圧縮を行わず、計算結果のみ表示
+  --jobs, -j N     バッチ処理の同時実行数 (デフォルト: CPUコア数÷4, 1で逐次実行)
+  --crf N          1パスCRFで圧縮 (0〜51, 小さいほど高画質)。目標サイズは上限として扱う
+                   (NVENCでは -cq としてGPUで圧縮。他のGPUエンコーダでは上限を守れないためlibx264を使う)
+  --time-budget S  1ファイルあたりのエンコード時間の目安(秒)。間に合う範囲で最も高画質なプリセットを選ぶ
+  --cpu            GPUエンコーダを使わず、libx264 (CPU) で圧縮
+  --fast-seek      キーフレームを60フレーム間隔に固定しBフレームを使わない
+                   (シーク・切り出しが速くなる代わりに、同じサイズでは画質がやや落ちる)
+  --batch PATH     ファイル・ディレクトリ・ワイルドカードを指定してフェーズ1を省略し、処理後に終了
+  --yes, -y        確認の質問 (続けますか？など) にすべて y で答える
+                   (標準入力が端末でない場合、未指定なら n として扱う)
+  --version, -v    バージョン情報を表示
+  --help, -h       このヘルプを表示
+
+画質モード:
+  1. 音質優先 (音声192kbps) - 音楽、講演、ASMR向け
+  2. 画質優先 (音声128kbps) - アニメ、映画、ゲーム実況向け
+  3. バランス (音声160kbps) - 一般的な動画向け
+
+ログファイル:
+  処理履歴は {_HISTORY_LOG_PATH} に保存されます
+
+プラットフォーム: {_PLATFORM}
+"""
+
+_BANNER = (
+    "=" * 60 + "\n"
+    "🎥 動画圧縮ツール - Windows/macOS/Linux対応版\n"
+    f"Platform: {_PLATFORM}\n"
+    + "=" * 60 + "\n"
+)
+
+_FAREWELL_TEXT = (
+    "\n👋 お疲れさん!またな!\n"
+    f"処理履歴は {_HISTORY_LOG_PATH} に保存されています。\n"
+)
+
+
+def _install_interrupt_handler(compressor: 'VideoCompressor'):
+    """Ctrl+C(WindowsではCtrl+Breakも)で残りのジョブを取り消し、実行中のffmpegを止めてから終了コード130で終わる"""
+    def handle(signum, frame):
+        # 終了待ちの間にもう一度押されたら通常のKeyboardInterruptにする
+        signal.signal(signum, signal.default_int_handler)
+        # 先にffmpegを止める（表示で例外が起きても終了処理は済ませる）
+        compressor.cancel()
+        compressor.logger.info("ユーザーにより中断")
+        # メインスレッドがprint中だとprintは再入エラーになるため、ファイル記述子へ直接書く
+        notice = _console_text("\n\n⚠️  処理を中断しました。\n")
+        try:
+            os.write(sys.stdout.fileno(),
+                     notice.encode(sys.stdout.encoding or 'utf-8', errors='replace'))
+        except (OSError, ValueError, AttributeError):
+            pass
+        sys.exit(130)
+    
+    signal.signal(signal.SIGINT, handle)
+    if hasattr(signal, 'SIGBREAK'):  # Windows
+        signal.signal(signal.SIGBREAK, handle)
+
+
+def _configure_stdout():
+    """絵文字を含む出力で UnicodeEncodeError にならないよう標準出力を設定"""
+    reconfigure = getattr(sys.stdout, 'reconfigure', None)
+    if reconfigure is None:
+        return
+    if _PLATFORM == 'Windows':
+        # リダイレクト時は cp932 などになるので UTF-8 に揃える
+        reconfigure(encoding='utf-8', errors='replace')
+    elif not _stdout_is_utf8():
+        reconfigure(errors='replace')
+
+
+def _stdout_is_utf8() -> bool:
+    return 'utf' in (sys.stdout.encoding or 'utf-8').lower()
+
+
+def _console_text(text: str) -> str:
+    """標準出力の文字コードで表せない文字（絵文字など）と直後の空白を取り除く"""
+    if _stdout_is_utf8():
+        return text
+    encoding = sys.stdout.encoding
+    chars = []
+    skipped = False
+    for ch in text:
+        try:
+            ch.encode(encoding)
+        except UnicodeEncodeError:
+            skipped = True
+            continue
+        if skipped and ch == ' ':
+            continue
+        skipped = False
+        chars.append(ch)
+    return ''.join(chars)
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """引数エラーをツールの他のエラーと同じ形式で表示するArgumentParser"""
+    
+    def error(self, message: str):
+        print(f"❌ エラー: {message}")
+        sys.exit(1)
+
+
+def _option_type(convert, is_valid, message: str):
+    """値を変換・検証し、不正な場合は message を表示させる argparse の type 関数を作る"""
+    def parse(value: str):
+        try:
+            result = convert(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(message)
+        if not is_valid(result):
+            raise argparse.ArgumentTypeError(message)
+        return result
+    return parse
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数の定義（ヘルプは _HELP_TEXT を表示するので自動生成しない）"""
+    parser = _ArgumentParser(prog='compress_video.py', add_help=False)
+    parser.add_argument('--version', '-v', action='store_true')
+    parser.add_argument('--help', '-h', action='store_true')
+    parser.add_argument('--dry-run', '-d', action='store_true')
+    parser.add_argument('--jobs', '-j', type=_option_type(
+        int, lambda n: n > 0, "1以上の整数を指定してください。"))
+    parser.add_argument('--crf', type=_option_type(
+        int, lambda n: 0 <= n <= 51, "0〜51の整数を指定してください。"))
+    parser.add_argument('--time-budget', type=_option_type(
+        float, lambda n: n > 0, "0より大きい秒数を指定してください。"))
+    parser.add_argument('--cpu', action='store_true')
+    parser.add_argument('--fast-seek', action='store_true')
+    parser.add_argument('--batch', metavar='PATH')
+    parser.add_argument('--yes', '-y', action='store_true')
+    return parser
+
+
 def main():
     """エントリーポイント"""
-    dry_run = False
-    
-    if len(sys.argv) > 1:
-        if sys.argv[1] in ['--version', '-v']:
-            print(f"動画圧縮ツール v{__version__}")
-            print(f"Platform: {platform.system()}")
-            sys.exit(0)
-        elif sys.argv[1] in ['--dry-run', '-d']:
-            dry_run = True
-            print("🔍 ドライランモード: 実際の圧縮は行わず、計算結果のみ表示します。")
-        elif sys.argv[1] in ['--help', '-h']:
-            print("動画圧縮ツール - 使い方")
-            print()
-            print("使用法:")
-            print("  python compress_video.py              通常モード")
-            print("  python compress_video.py --dry-run    ドライランモード")
-            print("  python compress_video.py --version    バージョン表示")
-            print("  python compress_video.py --help       ヘルプ表示")
-            print()
-            print("オプション:")
-            print("  --dry-run, -d    実際の圧縮を行わず、計算結果のみ表示")
-            print("  --version, -v    バージョン情報を表示")
-            print("  --help, -h       このヘルプを表示")
-            print()
-            print("画質モード:")
-            print("  1. 音質優先 (音声192kbps) - 音楽、講演、ASMR向け")
-            print("  2. 画質優先 (音声128kbps) - アニメ、映画、ゲーム実況向け")
-            print("  3. バランス (音声160kbps) - 一般的な動画向け")
-            print()
-            print("ログファイル:")
-            print(f"  処理履歴は {Path.home() / '.video-compressor' / 'history.log'} に保存されます")
-            print()
-            print(f"プラットフォーム: {platform.system()}")
-            sys.exit(0)
+    _configure_stdout()
+    args = _build_arg_parser().parse_args()
     
+    if args.version:
+        print(f"動画圧縮ツール v{__version__}")
+        print(f"Platform: {_PLATFORM}")
+        sys.exit(0)
+    if args.help:
+        sys.stdout.write(_console_text(_HELP_TEXT))
+        sys.stdout.flush()
+        sys.exit(0)
+    if args.dry_run:
+        print("🔍 ドライランモード: 実際の圧縮は行わず、計算結果のみ表示します。")
+    
+    compressor = None
     try:
-        print("=" * 60)
-        print("🎥 動画圧縮ツール - Windows/macOS/Linux対応版")
-        print(f"Platform: {platform.system()}")
-        print("=" * 60)
-        
-        compressor = VideoCompressor(dry_run=dry_run)
+        sys.stdout.write(_console_text(_BANNER))
+        sys.stdout.flush()
+        
+        compressor = VideoCompressor(
+            dry_run=args.dry_run,
+            jobs=args.jobs,
+            crf=args.crf,
+            time_budget=args.time_budget,
+            force_cpu=args.cpu,
+            fast_seek=args.fast_seek,
+            assume_yes=args.yes
+        )
+        _install_interrupt_handler(compressor)
         
         if not compressor.check_ffmpeg():
             print("\n❌ エラー: ffmpegがインストールされてないわ")
             print(compressor.get_ffmpeg_install_instructions())
-            compressor.logger.error(f"ffmpegが未インストール (Platform: {platform.system()})")
+            compressor.logger.error(f"ffmpegが未インストール (Platform: {_PLATFORM})")
             sys.exit(1)
         
+        encoder = compressor._pick_video_encoder()
+        accel = "CPU" if encoder == VideoCompressor.CPU_ENCODER else "GPU"
+        print(f"ビデオエンコーダ: {encoder} ({accel})")
+        
+        # --batch 指定時はフェーズ1を飛ばし、1回処理したら終了する
+        batch_files = None
+        if args.batch is not None:
+            try:
+                batch_files = compressor.resolve_input_files(args.batch)
+            except ValueError as e:
+                print(f"\n❌ エラー: {e}")
+                sys.exit(1)
+        
+        if args.dry_run:
+            continue_prompt = "もう1本シミュレートする？ (y/n): "
+        else:
+            continue_prompt = "もう1本圧縮する？ (y/n): "
+        
         while True:
-            compressor.run()
+            compressor.run(batch_files)
+            if batch_files is not None:
+                break
             
             print("\n" + "=" * 60)
-            if dry_run:
-                continue_choice = input("もう1本シミュレートする？ (y/n): ").strip().lower()
-            else:
-                continue_choice = input("もう1本圧縮する？ (y/n): ").strip().lower()
-            
-            if continue_choice != 'y':
-                print("\n👋 お疲れさん!またな!")
-                print(f"処理履歴は {Path.home() / '.video-compressor' / 'history.log'} に保存されています。")
-                compressor.logger.info("ツール終了")
+            if not compressor.confirm(continue_prompt):
                 break
             
             compressor.reset()
             print("\n")
         
+        sys.stdout.write(_console_text(_FAREWELL_TEXT))
+        sys.stdout.flush()
+        compressor.logger.info("ツール終了")
+        
     except KeyboardInterrupt:
-        print("\n\n⚠️  処理が中断されました。")
+        print(_console_text("\n\n⚠️  処理が中断されました。"))
         sys.exit(0)
+    except EOFError:
+        # パイプ等からの入力が途中で尽きた
+        print(_console_text("\n\n⚠️  入力が終了したため処理を中断しました。"))
+        sys.exit(1)
     except Exception as e:
         print(f"\n❌予期しないエラーが発生: {e}")
         sys.exit(1)
+    finally:
+        if compressor is not None:
+            compressor.close()
 
 
 if __name__ == "__main__":